@@ -1,38 +1,41 @@
 from __future__ import annotations
 
+from functools import cached_property
 from typing import Any
 
+from django.core.signals import setting_changed
+
 
 class AppSettings:
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_CLIENT_ID(self) -> str:
         """
         PayPal client ID.
         """
         return str(self._required_setting("SALESMAN_PAYPAL_CLIENT_ID"))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_CLIENT_SECRET(self) -> str:
         """
         PayPal client secret.
         """
         return str(self._required_setting("SALESMAN_PAYPAL_CLIENT_SECRET"))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_SANDBOX_MODE(self) -> bool:
         """
         Enable PayPal sandbox mode for development.
         """
         return bool(self._setting("SALESMAN_PAYPAL_SANDBOX_MODE", False))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_PAYMENT_LABEL(self) -> str:
         """
         Payment method label used when displayed in the basket.
         """
         return str(self._setting("SALESMAN_PAYPAL_PAYMENT_LABEL", "Pay with PayPal"))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_DEFAULT_CURRENCY(self) -> str:
         """
         Default ISO currency used for payments, must be set to a valid PayPal currency.
@@ -40,27 +43,33 @@ class AppSettings:
         """
         return str(self._setting("SALESMAN_PAYPAL_DEFAULT_CURRENCY", "USD"))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_RETURN_URL(self) -> str:
         """
         URL to redirect to when PayPal payment is approved.
         """
         return str(self._setting("SALESMAN_PAYPAL_RETURN_URL", default=""))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_CANCEL_URL(self) -> str:
         """
         URL to redirect to when PayPal payment is cancelled.
         """
         return str(self._setting("SALESMAN_PAYPAL_CANCEL_URL", default=""))
 
-    @property
+    @cached_property
     def SALESMAN_PAYPAL_PAID_STATUS(self) -> str:
         """
         Default paid status for fullfiled orders.
         """
         return str(self._setting("SALESMAN_PAYPAL_PAID_STATUS", "PROCESSING"))
 
+    def reload(self) -> None:
+        """
+        Clear cached settings, forcing them to be read again on next access.
+        """
+        self.__dict__.clear()
+
     def _setting(self, name: str, default: Any = None) -> Any:
         from django.conf import settings
 
@@ -79,3 +88,11 @@ class AppSettings:
 
 
 app_settings = AppSettings()
+
+
+def reload_app_settings(*, setting: str, **kwargs: Any) -> None:
+    if setting.startswith("SALESMAN_PAYPAL_"):
+        app_settings.reload()
+
+
+setting_changed.connect(reload_app_settings)
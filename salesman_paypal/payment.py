@@ -2,13 +2,18 @@ from __future__ import annotations
 
 import json
 import logging
+import re
 from decimal import Decimal
-from typing import Any, TypeVar
+from functools import wraps
+from itertools import islice
+from typing import Any, Callable, ClassVar, Sequence, TypeVar
 
+from django.core.signals import setting_changed
+from django.db import transaction
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import URLPattern, URLResolver, path, reverse
-from django.utils.decorators import method_decorator
+from django.utils.functional import lazy
 from django.utils.text import Truncator
 from paypalcheckoutsdk.core import (
     LiveEnvironment,
@@ -19,6 +24,7 @@ from paypalcheckoutsdk.core import (
 from paypalcheckoutsdk.orders import OrdersCaptureRequest, OrdersCreateRequest
 from paypalcheckoutsdk.payments import CapturesRefundRequest
 from paypalhttp import HttpError as PayPalHttpError
+from paypalhttp.http_response import HttpResponse as PayPalHttpResponse
 from paypalhttp.http_response import Result
 from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.renderers import JSONRenderer
@@ -35,6 +41,39 @@ logger = logging.getLogger(__name__)
 
 BasketOrOrder = TypeVar("BasketOrOrder", BaseBasket, BaseOrder)
 
+PAYPAL_ORDER_ID_RE = re.compile(r"[A-Za-z0-9-]{1,36}")
+
+
+class class_api_view:
+    """
+    Turns a classmethod into a DRF function view, built once per class.
+    """
+
+    def __init__(
+        self,
+        http_method_names: Sequence[str],
+        renderers: Sequence[type[Any]],
+    ) -> None:
+        self.http_method_names = list(http_method_names)
+        self.renderers = list(renderers)
+        self.views: dict[type[Any], Callable[..., Response]] = {}
+
+    def __call__(self, func: Callable[..., Response]) -> class_api_view:
+        self.func = func
+        return self
+
+    def __get__(self, obj: Any, cls: type[Any]) -> Callable[..., Response]:
+        if cls not in self.views:
+
+            @api_view(self.http_method_names)  # type: ignore
+            @renderer_classes(self.renderers)  # type: ignore
+            @wraps(self.func)
+            def view(request: Request, *args: Any, **kwargs: Any) -> Response:
+                return self.func(cls, request, *args, **kwargs)
+
+            self.views[cls] = view
+        return self.views[cls]
+
 
 class PayPalPayment(PaymentMethod):  # type: ignore
     """
@@ -42,7 +81,9 @@ class PayPalPayment(PaymentMethod):  # type: ignore
     """
 
     identifier = "paypal"
-    label = app_settings.SALESMAN_PAYPAL_PAYMENT_LABEL
+    label = lazy(lambda: app_settings.SALESMAN_PAYPAL_PAYMENT_LABEL, str)()
+
+    _clients: ClassVar[dict[type[PayPalPayment], PayPalHttpClient]] = {}
 
     def get_urls(self) -> list[URLPattern | URLResolver]:
         """
@@ -97,7 +138,7 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         paypal_request = OrdersCreateRequest()
         paypal_request.prefer("return=representation")
         paypal_request.request_body(self.get_paypal_order_data(obj, request))
-        paypal_response = self.get_paypal_client().execute(paypal_request)
+        paypal_response = self.execute_paypal_request(paypal_request)
         return paypal_response.result
 
     def get_paypal_order_data(
@@ -130,7 +171,10 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         https://developer.paypal.com/api/orders/v2/#definition-payer
         """
         if not obj.user:
-            return {"email_address": getattr(obj, "email", obj.extra["email"])}
+            email = getattr(obj, "email", None)
+            if email is None:
+                email = obj.extra["email"]
+            return {"email_address": email}
 
         return {
             "email_address": obj.user.email or None,
@@ -152,15 +196,16 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         https://developer.paypal.com/api/orders/v2/#definition-purchase_unit_request
         """
         currency = self.get_currency(request)
+        total = str(obj.total)
 
         return {
             "amount": {
                 "currency_code": currency,
-                "value": str(obj.total),
+                "value": total,
                 "breakdown": {
                     "item_total": {
                         "currency_code": currency,
-                        "value": str(obj.total),
+                        "value": total,
                     },
                 },
             },
@@ -180,20 +225,21 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         See available data to be set in PayPal:
         https://developer.paypal.com/api/orders/v2/#definition-item
         """
+        items = obj.get_items()
+
+        # Each description adds at least 5 characters ("1x " and ", "), so items past
+        # the first 26 always fall beyond the 127 character truncation limit.
+        descriptions = [f"{item.quantity}x {item.name}" for item in islice(items, 26)]
 
         return [
             {
-                "name": f"Purchase {len(obj.get_items())} items",
+                "name": f"Purchase {len(items)} items",
                 "unit_amount": {
                     "currency_code": self.get_currency(request),
                     "value": str(obj.total),
                 },
                 "quantity": "1",
-                "description": Truncator(
-                    ", ".join(
-                        [f"{item.quantity}x {item.name}" for item in obj.get_items()]
-                    )
-                ).chars(127),
+                "description": Truncator(", ".join(descriptions)).chars(127),
             }
         ]
 
@@ -237,7 +283,7 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         paypal_request = CapturesRefundRequest(payment.transaction_id)
         paypal_request.prefer("return=minimal")
         try:
-            self.get_paypal_client().execute(paypal_request)
+            self.execute_paypal_request(paypal_request)
         except PayPalHttpError as e:
             logger.error(e)
             return False
@@ -262,12 +308,10 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         """
         Parses the reference ID returning the object kind and ID.
         """
-        try:
-            kind, id = reference.split("_")
-            assert kind in ("basket", "order")
+        kind, _, id = reference.partition("_")
+        if kind in ("basket", "order") and id and "_" not in id:
             return kind, id
-        except Exception:
-            return None, None
+        return None, None
 
     @classmethod
     def get_paypal_environment(cls) -> PayPalEnvironment:
@@ -287,9 +331,37 @@ class PayPalPayment(PaymentMethod):  # type: ignore
     @classmethod
     def get_paypal_client(cls) -> PayPalHttpClient:
         """
-        Returns PayPal http API client.
+        Returns PayPal http API client, shared between requests so that
+        the access token is reused until it expires.
         """
-        return PayPalHttpClient(cls.get_paypal_environment())
+        client = cls._clients.get(cls)
+        if client is None:
+            client = PayPalHttpClient(cls.get_paypal_environment())
+            cls._clients[cls] = client
+        return client
+
+    @classmethod
+    def execute_paypal_request(
+        cls,
+        paypal_request: Any,
+    ) -> PayPalHttpResponse:
+        """
+        Execute request using the PayPal client. Cached client is dropped when
+        PayPal rejects its access token, so the next request fetches a new one.
+        """
+        try:
+            return cls.get_paypal_client().execute(paypal_request)
+        except PayPalHttpError as e:
+            if e.status_code == 401:
+                cls._clients.pop(cls, None)
+            raise
+
+    @classmethod
+    def clear_paypal_clients(cls) -> None:
+        """
+        Clear cached PayPal clients, forcing them to be built again on next use.
+        """
+        cls._clients.clear()
 
     @classmethod
     def return_view(cls, request: HttpRequest) -> HttpResponse:
@@ -309,20 +381,24 @@ class PayPalPayment(PaymentMethod):  # type: ignore
             return redirect(app_settings.SALESMAN_PAYPAL_CANCEL_URL)
         return render(request, "salesman_paypal/cancel.html")
 
-    @classmethod
-    @method_decorator(api_view(["POST"]))  # type: ignore
-    @method_decorator(renderer_classes([JSONRenderer]))  # type: ignore
-    def capture_view(cls, request: Request, order_id: int) -> Response:
+    @class_api_view(["POST"], renderers=[JSONRenderer])
+    def capture_view(cls, request: Request, order_id: str) -> Response:
         """
         Order capture view.
         """
+        if not PAYPAL_ORDER_ID_RE.fullmatch(order_id):
+            return Response({"detail": "Invalid paypal order ID"}, status=400)
+
         try:
             paypal_request = OrdersCaptureRequest(order_id)
             paypal_request.prefer("return=representation")
-            paypal_response = cls.get_paypal_client().execute(paypal_request)
+            paypal_response = cls.execute_paypal_request(paypal_request)
         except PayPalHttpError as e:
             logger.error(e)
-            error = json.loads(e.message)
+            try:
+                error = json.loads(e.message)
+            except ValueError:
+                error = {"detail": "PayPal request failed"}
             return Response(error, status=400)
 
         return cls.capture_paypal_order(request, paypal_response.result)
@@ -339,14 +415,15 @@ class PayPalPayment(PaymentMethod):  # type: ignore
         kind, id = cls.parse_reference(paypal_purchase_unit.custom_id)
         if kind == "basket":
             try:
-                basket = Basket.objects.get(id=id)
+                basket = Basket.objects.select_related("user").get(id=id)
             except BaseBasket.DoesNotExist:
                 logger.error(f"Missing basket: {id}")
                 return Response({"detail": "Missing basket"}, status=400)
 
             kwargs = {"status": app_settings.SALESMAN_PAYPAL_PAID_STATUS}
-            order = Order.objects.create_from_basket(basket, request, **kwargs)
-            basket.delete()
+            with transaction.atomic():
+                order = Order.objects.create_from_basket(basket, request, **kwargs)
+                basket.delete()
         elif kind == "order":
             try:
                 order = Order.objects.get(id=id)
@@ -367,3 +444,11 @@ class PayPalPayment(PaymentMethod):  # type: ignore
 
         logger.info(f"Order fulfilled: {order.ref}")
         return Response(paypal_order.dict())
+
+
+def reset_paypal_clients(*, setting: str, **kwargs: Any) -> None:
+    if setting.startswith("SALESMAN_PAYPAL_"):
+        PayPalPayment.clear_paypal_clients()
+
+
+setting_changed.connect(reset_paypal_clients)
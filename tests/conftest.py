@@ -0,0 +1,21 @@
+import django
+from django.conf import settings
+
+
+def pytest_configure() -> None:
+    settings.configure(
+        INSTALLED_APPS=[
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "salesman.basket",
+            "salesman.orders",
+            "salesman_paypal",
+        ],
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": ":memory:",
+            }
+        },
+    )
+    django.setup()
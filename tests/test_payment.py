@@ -0,0 +1,36 @@
+import unicodedata
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from django.utils.text import Truncator
+
+from salesman_paypal.payment import PayPalPayment
+
+
+def nfd(text: str) -> str:
+    return unicodedata.normalize("NFD", text)
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        [],
+        ["Shirt"],
+        ["Shirt", "Pants", "Socks"],
+        [f"Product {i}" for i in range(500)],
+        ["x" * 200],
+        [nfd("é" * 40), nfd("é" * 20), "zz"],
+        [nfd("é" * 60) for _ in range(40)],
+        ["́" * 50 for _ in range(40)],
+    ],
+)
+def test_get_paypal_items_data_description(names: list[str]) -> None:
+    items = [SimpleNamespace(quantity=1, name=name) for name in names]
+    obj: Any = SimpleNamespace(get_items=lambda: items, total=Decimal("10.00"))
+
+    data = PayPalPayment().get_paypal_items_data(obj, request=None)
+
+    expected = Truncator(", ".join(f"{i.quantity}x {i.name}" for i in items))
+    assert data[0]["description"] == expected.chars(127)